@@ -16,6 +16,7 @@ __all__ = [
     'UnifiedBacktestEngine',
     'ProfessionalUISystem',
     'RealTimeBacktestMonitor',
+    'VectorizedParameterSweepEngine',
 ]
 
 
@@ -52,5 +53,8 @@ def __getattr__(name):
     elif name == 'RealTimeBacktestMonitor':
         from .real_time_backtest_monitor import RealTimeBacktestMonitor
         return RealTimeBacktestMonitor
+    elif name == 'VectorizedParameterSweepEngine':
+        from .parameter_sweep_engine import VectorizedParameterSweepEngine
+        return VectorizedParameterSweepEngine
 
     raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -271,7 +271,7 @@ class ParallelBacktestEngine:
             self.logger.error(f"单个回测任务失败 {stock_code}: {e}")
             raise
 
-    def optimize_strategy_parameters(self, data: pd.DataFrame, strategy_func: Callable,
+    def optimize_strategy_parameters(self, data: pd.DataFrame, strategy_func: Union[Callable, str],
                                      param_grid: Dict[str, List], optimization_metric: str = 'sharpe_ratio',
                                      cv_folds: int = 5) -> Dict[str, Any]:
         """
@@ -279,7 +279,8 @@ class ParallelBacktestEngine:
 
         Args:
             data: 回测数据
-            strategy_func: 策略函数
+            strategy_func: 策略函数，或可批量扫描的内置策略名
+                (ma_cross / macd / rsi / bollinger，走向量化参数扫描引擎)
             param_grid: 参数网格
             optimization_metric: 优化指标
             cv_folds: 交叉验证折数
@@ -287,6 +288,11 @@ class ParallelBacktestEngine:
         Returns:
             Dict: 优化结果
         """
+        if isinstance(strategy_func, str):
+            from .parameter_sweep_engine import VectorizedParameterSweepEngine
+            return VectorizedParameterSweepEngine(max_workers=self.max_workers).optimize(
+                data, strategy_func, param_grid, optimization_metric, cv_folds)
+
         try:
             from itertools import product
 
@@ -54,6 +54,14 @@ class JITOptimizer:
 
         self._compiled_functions['backtest_core'] = optimized_backtest_core
 
+        # 带止损止盈/最大持有期的状态机回测核心
+        _ = core_backtest_state_machine(
+            test_prices, test_signals.astype(np.float64), 100000.0,
+            0.001, 0.001, 5.0, np.nan, np.nan, -1, True
+        )
+
+        self._compiled_functions['core_backtest'] = core_backtest_state_machine
+
     def _precompile_risk_metrics(self):
         """预编译风险指标计算函数"""
         test_returns = np.array([0.01, -0.02, 0.015, -0.01, 0.005])
@@ -134,6 +142,181 @@ def optimized_backtest_core(prices: np.ndarray, signals: np.ndarray,
 
     return positions, capital, returns
 
+# 状态机回测核心的输出列布局
+EXIT_REASON_LABELS = (None, 'Signal', 'Stop Loss', 'Take Profit', 'Max Holding Period')
+EXIT_NONE, EXIT_SIGNAL, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_MAX_HOLDING = range(5)
+
+BAR_FLOAT_COLUMNS = ('entry_price', 'commission', 'trade_value', 'exit_price',
+                     'trade_profit', 'capital', 'equity', 'returns')
+BAR_INT_COLUMNS = ('position', 'shares', 'holding_periods', 'exit_reason')
+TRADE_FLOAT_COLUMNS = ('entry_price', 'commission', 'entry_value', 'exit_price',
+                       'trade_profit', 'exit_commission')
+TRADE_INT_COLUMNS = ('entry_index', 'position', 'shares', 'exit_index',
+                     'exit_reason', 'holding_periods')
+
+
+@njit(cache=True)  # 不使用fastmath，保证与逐行引擎结果逐位一致
+def core_backtest_state_machine(prices: np.ndarray, signals: np.ndarray,
+                                initial_capital: float, commission_pct: float,
+                                slippage_pct: float, min_commission: float,
+                                stop_loss_pct: float, take_profit_pct: float,
+                                max_holding_periods: int, enable_compound: bool):
+    """
+    带止损/止盈/最大持有期/复利语义的回测状态机（Numba JIT编译）
+
+    所有持仓、资金、权益状态保存在预分配数组中，语义与
+    UnifiedBacktestEngine 的逐行回测完全一致。
+
+    Args:
+        prices: 价格数组
+        signals: 信号数组（float64，允许NaN）
+        initial_capital: 初始资金
+        commission_pct: 手续费比例
+        slippage_pct: 滑点比例
+        min_commission: 最小手续费
+        stop_loss_pct: 止损比例，NaN表示不启用
+        take_profit_pct: 止盈比例，NaN表示不启用
+        max_holding_periods: 最大持有期，负数表示不启用
+        enable_compound: 是否启用复利
+
+    Returns:
+        Tuple: (逐K线浮点矩阵, 逐K线整数矩阵, 交易浮点矩阵, 交易整数矩阵, 交易笔数)，
+        列顺序见 BAR_FLOAT_COLUMNS / BAR_INT_COLUMNS / TRADE_FLOAT_COLUMNS / TRADE_INT_COLUMNS
+    """
+    n = len(prices)
+    bar_float = np.zeros((n, 8), dtype=np.float64)
+    bar_int = np.zeros((n, 4), dtype=np.int64)
+    trade_float = np.zeros((n, 6), dtype=np.float64)
+    trade_int = np.full((n, 6), -1, dtype=np.int64)
+    n_trades = 0
+
+    use_stop_loss = not np.isnan(stop_loss_pct)
+    use_take_profit = not np.isnan(take_profit_pct)
+
+    position = 0
+    entry_price = 0.0
+    holding_periods = 0
+    current_capital = initial_capital
+    current_equity = initial_capital
+    shares = 0
+
+    for i in range(n):
+        price = prices[i]
+        signal = signals[i]
+
+        # 更新持有期
+        if position != 0:
+            holding_periods += 1
+
+        # 检查止损止盈和最大持有期
+        exit_reason = EXIT_NONE
+        if position != 0:
+            if use_stop_loss and (
+                    (position > 0 and price <= entry_price * (1 - stop_loss_pct)) or
+                    (position < 0 and price >= entry_price * (1 + stop_loss_pct))):
+                exit_reason = EXIT_STOP_LOSS
+            elif use_take_profit and (
+                    (position > 0 and price >= entry_price * (1 + take_profit_pct)) or
+                    (position < 0 and price <= entry_price * (1 - take_profit_pct))):
+                exit_reason = EXIT_TAKE_PROFIT
+            elif max_holding_periods >= 0 and holding_periods >= max_holding_periods:
+                exit_reason = EXIT_MAX_HOLDING
+
+        # 平仓
+        if position != 0 and (signal == -position or exit_reason != EXIT_NONE):
+            if exit_reason == EXIT_NONE:
+                exit_reason = EXIT_SIGNAL
+            trade_value = shares * price
+            commission = max(trade_value * commission_pct, min_commission)
+            if position > 0:
+                actual_price = price * (1 - slippage_pct)
+                trade_profit = shares * (actual_price - entry_price)
+            else:
+                actual_price = price * (1 + slippage_pct)
+                trade_profit = shares * (entry_price - actual_price)
+            net_profit = trade_profit - commission
+            current_capital += (shares * actual_price - commission)
+
+            bar_float[i, 3] = actual_price
+            bar_float[i, 4] = net_profit
+            bar_float[i, 1] += commission
+            bar_int[i, 2] = holding_periods
+            bar_int[i, 3] = exit_reason
+
+            if n_trades > 0:
+                t = n_trades - 1
+                trade_int[t, 3] = i
+                trade_float[t, 3] = actual_price
+                trade_int[t, 4] = exit_reason
+                trade_int[t, 5] = holding_periods
+                trade_float[t, 4] = net_profit
+                trade_float[t, 5] = commission
+
+            position = 0
+            entry_price = 0.0
+            shares = 0
+            holding_periods = 0
+
+        # 开仓
+        if position == 0 and signal != 0:
+            if signal > 0:
+                actual_price = price * (1 + slippage_pct)
+                new_position = 1
+            else:
+                actual_price = price * (1 - slippage_pct)
+                new_position = -1
+            # 注意：与逐行引擎一致，即使股数为0方向也会被记录
+            position = new_position
+
+            if enable_compound:
+                available_capital = current_equity * 0.9
+            else:
+                available_capital = current_capital * 0.9
+
+            commission = max(available_capital * commission_pct, min_commission)
+            net_available = available_capital - commission
+            new_shares = 0
+            if actual_price > 0:
+                raw_shares = net_available / actual_price
+                if raw_shares > 1e9:
+                    new_shares = 1000000000
+                elif raw_shares > 0:
+                    new_shares = int(raw_shares)
+
+            if new_shares > 0:
+                trade_value = new_shares * actual_price
+                current_capital -= trade_value + commission
+                entry_price = actual_price
+                shares = new_shares
+                holding_periods = 0
+
+                bar_int[i, 0] = position
+                bar_float[i, 0] = actual_price
+                bar_int[i, 1] = new_shares
+                bar_float[i, 1] = commission
+                bar_float[i, 2] = trade_value
+
+                t = n_trades
+                trade_int[t, 0] = i
+                trade_float[t, 0] = actual_price
+                trade_int[t, 1] = position
+                trade_int[t, 2] = new_shares
+                trade_float[t, 1] = commission
+                trade_float[t, 2] = trade_value
+                n_trades += 1
+
+        # 更新账户状态
+        if position != 0:
+            current_equity = current_capital + shares * price
+        else:
+            current_equity = current_capital
+        bar_float[i, 5] = current_capital
+        bar_float[i, 6] = current_equity
+        if i > 0 and bar_float[i - 1, 6] != 0:
+            bar_float[i, 7] = (current_equity - bar_float[i - 1, 6]) / bar_float[i - 1, 6]
+
+    return bar_float, bar_int, trade_float[:n_trades], trade_int[:n_trades], n_trades
+
 # 并行优化的风险指标计算
 @njit(cache=True, fastmath=True, parallel=True)
 def calculate_sharpe_ratio_jit(returns: np.ndarray, risk_free_rate: float = 0.02) -> float:
@@ -0,0 +1,457 @@
+from loguru import logger
+"""
+向量化参数扫描引擎
+将参数网格作为 (参数组合 × K线) 的二维矩阵批量计算，
+同一窗口/周期的指标中间结果在所有参数组合间共享，
+多股票时通过共享内存价格矩阵分发到进程池。
+"""
+
+import os
+import time
+import multiprocessing
+from itertools import product
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Tuple, Callable
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+
+# ==================== 共享指标中间结果 ====================
+
+class IndicatorIntermediateCache:
+    """
+    指标中间结果缓存
+
+    对同一价格序列，相同窗口的均线/标准差、相同跨度的EMA只计算一次，
+    供参数网格中所有组合复用。计算方式与 builtin_strategies 中的pandas实现一致。
+    """
+
+    def __init__(self, close: np.ndarray):
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self._series = pd.Series(self.close)
+        self._cache: Dict[Tuple, np.ndarray] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple, func: Callable[[], np.ndarray]) -> np.ndarray:
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        value = func()
+        self._cache[key] = value
+        return value
+
+    def sma(self, window: int) -> np.ndarray:
+        return self._get(('sma', window),
+                         lambda: self._series.rolling(window=window).mean().to_numpy())
+
+    def rolling_std(self, window: int) -> np.ndarray:
+        return self._get(('std', window),
+                         lambda: self._series.rolling(window=window).std().to_numpy())
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._get(('ema', span),
+                         lambda: self._series.ewm(span=span).mean().to_numpy())
+
+    def macd(self, fast: int, slow: int) -> np.ndarray:
+        return self._get(('macd', fast, slow), lambda: self.ema(fast) - self.ema(slow))
+
+    def macd_signal_line(self, fast: int, slow: int, signal: int) -> np.ndarray:
+        return self._get(('macd_signal', fast, slow, signal),
+                         lambda: pd.Series(self.macd(fast, slow)).ewm(span=signal).mean().to_numpy())
+
+    def rsi(self, period: int) -> np.ndarray:
+        def _calc():
+            delta = self._series.diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            rs = gain / loss
+            return (100 - (100 / (1 + rs))).to_numpy()
+        return self._get(('rsi', period), _calc)
+
+
+def _stack(cache_func: Callable[..., np.ndarray], keys: List[Tuple]) -> np.ndarray:
+    """按唯一键计算一次，再按组合顺序展开为二维矩阵"""
+    unique_keys = list(dict.fromkeys(keys))
+    unique_rows = np.vstack([cache_func(*key) for key in unique_keys])
+    positions = {key: i for i, key in enumerate(unique_keys)}
+    return unique_rows[[positions[key] for key in keys]]
+
+
+def _cross_state_signals(diff: np.ndarray, warmup: np.ndarray) -> np.ndarray:
+    """根据 sign(快线-慢线) 的跳变生成 ±1 信号（-1→1 买入，1→-1 卖出）"""
+    state = np.sign(np.nan_to_num(diff, nan=0.0))
+    change = np.zeros_like(state)
+    change[:, 1:] = state[:, 1:] - state[:, :-1]
+    signals = np.where(change == 2, 1.0, np.where(change == -2, -1.0, 0.0))
+    bars = np.arange(signals.shape[1])
+    signals[bars[None, :] < warmup[:, None]] = 0.0
+    return signals
+
+
+def ma_cross_signals(cache: IndicatorIntermediateCache, combos: List[Dict[str, Any]]) -> np.ndarray:
+    """均线交叉信号矩阵 (组合 × K线)，参数: short_period, long_period"""
+    short = _stack(cache.sma, [(c['short_period'],) for c in combos])
+    long = _stack(cache.sma, [(c['long_period'],) for c in combos])
+    warmup = np.array([c['long_period'] for c in combos])
+    return _cross_state_signals(short - long, warmup)
+
+
+def macd_signals(cache: IndicatorIntermediateCache, combos: List[Dict[str, Any]]) -> np.ndarray:
+    """MACD金叉死叉信号矩阵，参数: fast_period, slow_period, signal_period"""
+    macd = _stack(cache.macd, [(c['fast_period'], c['slow_period']) for c in combos])
+    signal_line = _stack(cache.macd_signal_line,
+                         [(c['fast_period'], c['slow_period'], c['signal_period']) for c in combos])
+    warmup = np.array([c['slow_period'] + c['signal_period'] for c in combos])
+    return _cross_state_signals(macd - signal_line, warmup)
+
+
+def rsi_signals(cache: IndicatorIntermediateCache, combos: List[Dict[str, Any]]) -> np.ndarray:
+    """RSI超买超卖信号矩阵，参数: period, oversold, overbought"""
+    rsi = _stack(cache.rsi, [(c['period'],) for c in combos])
+    oversold = np.array([c['oversold'] for c in combos], dtype=np.float64)[:, None]
+    overbought = np.array([c['overbought'] for c in combos], dtype=np.float64)[:, None]
+
+    signals = np.zeros_like(rsi)
+    prev, cur = rsi[:, :-1], rsi[:, 1:]
+    buy = (prev <= oversold) & (cur > oversold)
+    sell = ~buy & (prev >= overbought) & (cur < overbought)
+    signals[:, 1:] = np.where(buy, 1.0, np.where(sell, -1.0, 0.0))
+    warmup = np.array([c['period'] + 1 for c in combos])
+    signals[np.arange(signals.shape[1])[None, :] < warmup[:, None]] = 0.0
+    return signals
+
+
+def bollinger_signals(cache: IndicatorIntermediateCache, combos: List[Dict[str, Any]]) -> np.ndarray:
+    """布林带反转信号矩阵，参数: period, std_dev"""
+    middle = _stack(cache.sma, [(c['period'],) for c in combos])
+    std = _stack(cache.rolling_std, [(c['period'],) for c in combos])
+    width = np.array([c['std_dev'] for c in combos], dtype=np.float64)[:, None]
+    upper = middle + std * width
+    lower = middle - std * width
+    close = cache.close[None, :]
+
+    signals = np.zeros_like(middle)
+    buy = (close[:, :-1] <= lower[:, :-1]) & (close[:, 1:] > lower[:, 1:])
+    sell = ~buy & (close[:, :-1] >= upper[:, :-1]) & (close[:, 1:] < upper[:, 1:])
+    signals[:, 1:] = np.where(buy, 1.0, np.where(sell, -1.0, 0.0))
+    warmup = np.array([c['period'] for c in combos])
+    signals[np.arange(signals.shape[1])[None, :] < warmup[:, None]] = 0.0
+    return signals
+
+
+# 可批量扫描的策略: 名称 -> 信号矩阵生成函数
+SWEEPABLE_STRATEGIES: Dict[str, Callable] = {
+    'ma_cross': ma_cross_signals,
+    'macd': macd_signals,
+    'rsi': rsi_signals,
+    'bollinger': bollinger_signals,
+}
+
+
+# ==================== 批量回测核心 ====================
+
+@njit(cache=True, parallel=True)
+def batch_backtest_returns(prices: np.ndarray, signals: np.ndarray,
+                           initial_capital: float, position_size: float,
+                           commission_pct: float, slippage_pct: float) -> np.ndarray:
+    """
+    批量回测核心（Numba JIT编译，参数组合间并行）
+
+    每一行的交易逻辑与 jit_optimizer.optimized_backtest_core 一致。
+
+    Returns:
+        np.ndarray: 收益率矩阵 (组合 × K线)
+    """
+    n_combos, n = signals.shape
+    returns = np.zeros((n_combos, n))
+
+    for p in prange(n_combos):
+        prev_equity = initial_capital
+        current_position = 0.0
+        current_capital = initial_capital
+
+        for i in range(1, n):
+            signal = signals[p, i]
+            price = prices[i]
+
+            if signal == 1 and current_position == 0:
+                trade_cost = price * (commission_pct + slippage_pct)
+                shares = (current_capital * position_size) / (price + trade_cost)
+                current_position = shares
+                current_capital -= shares * (price + trade_cost)
+            elif signal == -1 and current_position > 0:
+                trade_cost = price * (commission_pct + slippage_pct)
+                current_capital += current_position * (price - trade_cost)
+                current_position = 0.0
+
+            if current_position > 0:
+                equity = current_capital + current_position * price
+            else:
+                equity = current_capital
+
+            if prev_equity != 0:
+                returns[p, i] = (equity - prev_equity) / prev_equity
+            prev_equity = equity
+
+    return returns
+
+
+def batch_optimization_metric(returns: np.ndarray, metric: str) -> np.ndarray:
+    """
+    按行计算优化指标，与 ParallelBacktestEngine._calculate_optimization_metric 一致
+
+    Args:
+        returns: 收益率矩阵 (组合 × K线)
+        metric: sharpe_ratio / total_return / max_drawdown / calmar_ratio
+    """
+    if returns.shape[1] == 0:
+        return np.zeros(returns.shape[0])
+
+    if metric == 'sharpe_ratio':
+        std = returns.std(axis=1, ddof=1)
+        mean = returns.mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = mean / std * np.sqrt(252)
+        return np.where(std != 0, score, 0.0)
+
+    total_return = np.prod(1 + returns, axis=1) - 1
+    if metric == 'total_return':
+        return total_return
+
+    cumulative = np.cumprod(1 + returns, axis=1)
+    running_max = np.maximum.accumulate(cumulative, axis=1)
+    min_drawdown = ((cumulative - running_max) / running_max).min(axis=1)
+    if metric == 'max_drawdown':
+        return -min_drawdown
+    if metric == 'calmar_ratio':
+        max_drawdown = np.abs(min_drawdown)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = total_return / max_drawdown
+        return np.where(max_drawdown != 0, score, 0.0)
+    return np.zeros(returns.shape[0])
+
+
+def expand_param_grid(param_grid: Dict[str, List]) -> List[Dict[str, Any]]:
+    """展开参数网格，顺序与 optimize_strategy_parameters 一致"""
+    param_names = list(param_grid.keys())
+    return [dict(zip(param_names, combo)) for combo in product(*param_grid.values())]
+
+
+def sweep_fold_scores(close: np.ndarray, strategy: str, combos: List[Dict[str, Any]],
+                      optimization_metric: str = 'sharpe_ratio', cv_folds: int = 5,
+                      chunk_size: int = 1024, backtest_params: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    计算单个价格序列上所有参数组合在各交叉验证折上的得分
+
+    折的划分与 ParallelBacktestEngine.optimize_strategy_parameters 相同
+    （每折取两个fold长度的数据，指标在折内重新计算）。
+
+    Returns:
+        np.ndarray: 得分矩阵 (组合 × 有效折数)
+    """
+    signal_func = SWEEPABLE_STRATEGIES[strategy]
+    params = {'initial_capital': 100000.0, 'position_size': 1.0,
+              'commission_pct': 0.001, 'slippage_pct': 0.001}
+    params.update(backtest_params or {})
+
+    close = np.asarray(close, dtype=np.float64)
+    fold_size = len(close) // cv_folds
+    fold_scores = []
+
+    for fold in range(cv_folds):
+        start_idx = fold * fold_size
+        end_idx = start_idx + fold_size * 2
+        if end_idx > len(close):
+            break
+
+        fold_close = np.ascontiguousarray(close[start_idx:end_idx])
+        cache = IndicatorIntermediateCache(fold_close)
+        scores = np.empty(len(combos))
+
+        # 分块控制 (组合 × K线) 矩阵的内存占用
+        for chunk_start in range(0, len(combos), chunk_size):
+            chunk = combos[chunk_start:chunk_start + chunk_size]
+            signals = np.ascontiguousarray(signal_func(cache, chunk))
+            returns = batch_backtest_returns(
+                fold_close, signals, float(params['initial_capital']), float(params['position_size']),
+                float(params['commission_pct']), float(params['slippage_pct'])
+            )
+            scores[chunk_start:chunk_start + len(chunk)] = batch_optimization_metric(
+                returns, optimization_metric)
+
+        fold_scores.append(scores)
+
+    if not fold_scores:
+        return np.empty((len(combos), 0))
+    return np.column_stack(fold_scores)
+
+
+def _summarize_scores(combos: List[Dict[str, Any]], fold_scores: np.ndarray,
+                      optimization_metric: str) -> Dict[str, Any]:
+    """将得分矩阵整理为与 optimize_strategy_parameters 相同的结果格式"""
+    optimization_results = []
+    if fold_scores.shape[1] > 0:
+        avg_scores = fold_scores.mean(axis=1)
+        std_scores = fold_scores.std(axis=1)
+        for i, params in enumerate(combos):
+            optimization_results.append({
+                'params': params,
+                'score': float(avg_scores[i]),
+                'score_std': float(std_scores[i]),
+                'fold_scores': fold_scores[i].tolist()
+            })
+
+    optimization_results.sort(key=lambda x: x['score'], reverse=True)
+    best_result = optimization_results[0] if optimization_results else None
+
+    return {
+        'best_params': best_result['params'] if best_result else None,
+        'best_score': best_result['score'] if best_result else None,
+        'all_results': optimization_results,
+        'optimization_metric': optimization_metric
+    }
+
+
+def _sweep_shared_worker(shm_name: str, shape: Tuple[int, int], lengths: List[int],
+                         rows: List[int], strategy: str, combos: List[Dict[str, Any]],
+                         optimization_metric: str, cv_folds: int, chunk_size: int,
+                         backtest_params: Optional[Dict[str, float]]) -> Dict[int, np.ndarray]:
+    """进程池工作函数：从共享内存读取价格矩阵，计算分配到的股票"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        return {
+            row: sweep_fold_scores(prices[row, :lengths[row]], strategy, combos,
+                                   optimization_metric, cv_folds, chunk_size, backtest_params)
+            for row in rows
+        }
+    finally:
+        shm.close()
+
+
+class VectorizedParameterSweepEngine:
+    """
+    向量化参数扫描引擎
+
+    支持 ma_cross / macd / rsi / bollinger 四类内置策略，
+    参数网格整体作为二维矩阵计算，多股票时使用进程池+共享内存。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 1024):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1))
+        self.chunk_size = chunk_size
+        self.logger = logger
+
+    @staticmethod
+    def is_sweepable(strategy: Any) -> bool:
+        """判断策略是否支持批量扫描"""
+        return isinstance(strategy, str) and strategy in SWEEPABLE_STRATEGIES
+
+    def optimize(self, data: pd.DataFrame, strategy: str, param_grid: Dict[str, List],
+                 optimization_metric: str = 'sharpe_ratio', cv_folds: int = 5,
+                 price_col: str = 'close', backtest_params: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        单股票参数优化
+
+        Returns:
+            Dict: 与 ParallelBacktestEngine.optimize_strategy_parameters 相同格式的结果
+        """
+        if not self.is_sweepable(strategy):
+            raise ValueError(f"不支持批量扫描的策略: {strategy}")
+
+        combos = expand_param_grid(param_grid)
+        self.logger.info(f"开始向量化参数扫描 - 策略: {strategy}, 参数组合数: {len(combos)}")
+        start_time = time.time()
+
+        fold_scores = sweep_fold_scores(
+            data[price_col].to_numpy(dtype=np.float64), strategy, combos,
+            optimization_metric, cv_folds, self.chunk_size, backtest_params
+        )
+        result = _summarize_scores(combos, fold_scores, optimization_metric)
+        result['elapsed_seconds'] = time.time() - start_time
+        return result
+
+    def optimize_universe(self, data_dict: Dict[str, pd.DataFrame], strategy: str,
+                          param_grid: Dict[str, List], optimization_metric: str = 'sharpe_ratio',
+                          cv_folds: int = 5, price_col: str = 'close',
+                          backtest_params: Optional[Dict[str, float]] = None,
+                          use_processes: bool = True) -> Dict[str, Any]:
+        """
+        多股票参数优化
+
+        价格序列打包进一块共享内存，按股票分组提交到进程池，
+        子进程直接映射共享内存，避免逐任务序列化价格数据。
+
+        Returns:
+            Dict: {'per_symbol': {代码: 单股票结果}, 'aggregate': 跨股票平均得分结果, ...}
+        """
+        if not self.is_sweepable(strategy):
+            raise ValueError(f"不支持批量扫描的策略: {strategy}")
+
+        combos = expand_param_grid(param_grid)
+        symbols = list(data_dict.keys())
+        self.logger.info(
+            f"开始多股票向量化参数扫描 - 股票数: {len(symbols)}, 参数组合数: {len(combos)}")
+        start_time = time.time()
+
+        series = [data_dict[s][price_col].to_numpy(dtype=np.float64) for s in symbols]
+        lengths = [len(s) for s in series]
+        shape = (len(symbols), max(lengths) if lengths else 0)
+
+        scores_by_row: Dict[int, np.ndarray] = {}
+        if use_processes and self.max_workers > 1 and len(symbols) > 1 and shape[1] > 0:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+            try:
+                prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+                for row, values in enumerate(series):
+                    prices[row, :len(values)] = values
+
+                n_groups = min(self.max_workers, len(symbols))
+                groups = [list(range(len(symbols)))[g::n_groups] for g in range(n_groups)]
+                # 使用spawn启动子进程，避免fork继承Numba并行线程池导致死锁
+                with ProcessPoolExecutor(max_workers=n_groups,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+                    futures = [
+                        executor.submit(_sweep_shared_worker, shm.name, shape, lengths, rows,
+                                        strategy, combos, optimization_metric, cv_folds,
+                                        self.chunk_size, backtest_params)
+                        for rows in groups
+                    ]
+                    for future in as_completed(futures):
+                        try:
+                            scores_by_row.update(future.result())
+                        except Exception as e:
+                            self.logger.error(f"参数扫描子任务失败: {e}")
+            finally:
+                shm.close()
+                shm.unlink()
+        else:
+            for row, values in enumerate(series):
+                scores_by_row[row] = sweep_fold_scores(
+                    values, strategy, combos, optimization_metric, cv_folds,
+                    self.chunk_size, backtest_params)
+
+        per_symbol = {
+            symbols[row]: _summarize_scores(combos, scores, optimization_metric)
+            for row, scores in scores_by_row.items()
+        }
+
+        # 跨股票聚合：各股票平均得分的均值
+        symbol_means = [scores.mean(axis=1) for scores in scores_by_row.values() if scores.shape[1] > 0]
+        aggregate = _summarize_scores(
+            combos, np.column_stack(symbol_means) if symbol_means else np.empty((len(combos), 0)),
+            optimization_metric)
+
+        elapsed = time.time() - start_time
+        self.logger.info(f"多股票参数扫描完成 - 耗时: {elapsed:.2f}s")
+        return {
+            'per_symbol': per_symbol,
+            'aggregate': aggregate,
+            'total_combinations': len(combos) * len(symbols),
+            'elapsed_seconds': elapsed
+        }
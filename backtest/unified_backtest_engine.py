@@ -803,7 +803,111 @@ class UnifiedBacktestEngine:
                            slippage_pct: float, min_commission: float,
                            stop_loss_pct: Optional[float], take_profit_pct: Optional[float],
                            max_holding_periods: Optional[int], enable_compound: bool) -> pd.DataFrame:
-        """运行核心回测逻辑（基于修复版引擎）"""
+        """运行核心回测逻辑（优先使用数组状态机，失败时回退逐行引擎）"""
+        if len(data) > 1:
+            try:
+                return self._run_array_core_backtest(
+                    data, signal_col, price_col, initial_capital, commission_pct,
+                    slippage_pct, min_commission, stop_loss_pct, take_profit_pct,
+                    max_holding_periods, enable_compound
+                )
+            except Exception as e:
+                self.logger.warning(f"数组状态机回测失败，回退逐行引擎: {e}")
+
+        return self._run_iterative_core_backtest(
+            data, signal_col, price_col, initial_capital, position_size, commission_pct,
+            slippage_pct, min_commission, stop_loss_pct, take_profit_pct,
+            max_holding_periods, enable_compound
+        )
+
+    def _run_array_core_backtest(self, data: pd.DataFrame, signal_col: str, price_col: str,
+                                 initial_capital: float, commission_pct: float,
+                                 slippage_pct: float, min_commission: float,
+                                 stop_loss_pct: Optional[float], take_profit_pct: Optional[float],
+                                 max_holding_periods: Optional[int], enable_compound: bool) -> pd.DataFrame:
+        """
+        数组状态机回测
+
+        持仓/资金/权益状态全部保存在预分配的NumPy数组中（Numba编译），
+        结果DataFrame和交易列表在循环结束后一次性构建。
+        """
+        from backtest.jit_optimizer import (
+            core_backtest_state_machine, EXIT_REASON_LABELS,
+            BAR_FLOAT_COLUMNS, BAR_INT_COLUMNS, TRADE_FLOAT_COLUMNS, TRADE_INT_COLUMNS
+        )
+
+        prices = np.ascontiguousarray(data[price_col].to_numpy(dtype=np.float64))
+        signals = np.ascontiguousarray(data[signal_col].to_numpy(dtype=np.float64))
+
+        bar_float, bar_int, trade_float, trade_int, n_trades = core_backtest_state_machine(
+            prices, signals, float(initial_capital), float(commission_pct),
+            float(slippage_pct), float(min_commission),
+            np.nan if stop_loss_pct is None else float(stop_loss_pct),
+            np.nan if take_profit_pct is None else float(take_profit_pct),
+            -1 if max_holding_periods is None else int(max_holding_periods),
+            bool(enable_compound)
+        )
+
+        bf = dict(zip(BAR_FLOAT_COLUMNS, bar_float.T))
+        bi = dict(zip(BAR_INT_COLUMNS, bar_int.T))
+        index_values = data.index.astype(object).to_numpy()
+        labels = np.array(EXIT_REASON_LABELS, dtype=object)
+
+        entry_mask = bi['position'] != 0
+        exit_mask = bi['exit_reason'] != 0
+        entry_date = np.full(len(data), None, dtype=object)
+        entry_date[entry_mask] = index_values[entry_mask]
+        exit_date = np.full(len(data), None, dtype=object)
+        exit_date[exit_mask] = index_values[exit_mask]
+
+        results = data.copy()
+        results['position'] = bi['position']
+        results['entry_price'] = bf['entry_price']
+        results['entry_date'] = pd.Series(entry_date, index=results.index, dtype=object)
+        results['exit_price'] = bf['exit_price']
+        results['exit_date'] = pd.Series(exit_date, index=results.index, dtype=object)
+        results['holding_periods'] = bi['holding_periods']
+        results['exit_reason'] = labels[bi['exit_reason']]
+        results['capital'] = bf['capital']
+        results['equity'] = bf['equity']
+        results['returns'] = bf['returns']
+        results['trade_profit'] = bf['trade_profit']
+        results['commission'] = bf['commission']
+        results['shares'] = bi['shares']
+        results['trade_value'] = bf['trade_value']
+
+        # 构建交易记录
+        self.trades = []
+        for t in range(n_trades):
+            tf = dict(zip(TRADE_FLOAT_COLUMNS, trade_float[t]))
+            ti = dict(zip(TRADE_INT_COLUMNS, trade_int[t]))
+            trade = {
+                'entry_date': index_values[ti['entry_index']],
+                'entry_price': float(tf['entry_price']),
+                'position': int(ti['position']),
+                'shares': int(ti['shares']),
+                'commission': float(tf['commission']),
+                'entry_value': float(tf['entry_value'])
+            }
+            if ti['exit_index'] >= 0:
+                trade.update({
+                    'exit_date': index_values[ti['exit_index']],
+                    'exit_price': float(tf['exit_price']),
+                    'exit_reason': EXIT_REASON_LABELS[ti['exit_reason']],
+                    'holding_periods': int(ti['holding_periods']),
+                    'trade_profit': float(tf['trade_profit']),
+                    'exit_commission': float(tf['exit_commission'])
+                })
+            self.trades.append(trade)
+
+        return results
+
+    def _run_iterative_core_backtest(self, data: pd.DataFrame, signal_col: str, price_col: str,
+                                     initial_capital: float, position_size: float, commission_pct: float,
+                                     slippage_pct: float, min_commission: float,
+                                     stop_loss_pct: Optional[float], take_profit_pct: Optional[float],
+                                     max_holding_periods: Optional[int], enable_compound: bool) -> pd.DataFrame:
+        """运行核心回测逻辑（基于修复版引擎的逐行实现）"""
 
         # 复制数据用于回测
         results = data.copy()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+数组状态机回测核心一致性测试
+
+验证 UnifiedBacktestEngine 的数组状态机回测与逐行回测在
+止损、止盈、最大持有期、复利等配置下产生完全一致的交易和权益。
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+try:
+    from backtest.unified_backtest_engine import UnifiedBacktestEngine
+    ENGINE_AVAILABLE = True
+except ImportError as e:
+    print(f"导入错误: {e}")
+    ENGINE_AVAILABLE = False
+
+
+def _make_fixture(n: int, seed: int, nan_signals: bool = False) -> pd.DataFrame:
+    """生成带随机信号的K线测试数据"""
+    rng = np.random.default_rng(seed)
+    close = 10.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    signal = rng.choice([-1, 0, 0, 0, 1], size=n).astype(float)
+    if nan_signals:
+        signal[rng.random(n) < 0.05] = np.nan
+    index = pd.date_range('2015-01-01', periods=n, freq='D')
+    return pd.DataFrame({
+        'open': close, 'high': close * 1.01, 'low': close * 0.99,
+        'close': close, 'volume': 1000.0, 'signal': signal
+    }, index=index)
+
+
+@unittest.skipUnless(ENGINE_AVAILABLE, "回测引擎不可用")
+class TestArrayBacktestCoreParity(unittest.TestCase):
+    """数组状态机与逐行回测一致性测试"""
+
+    CONFIGS = [
+        dict(stop_loss_pct=None, take_profit_pct=None, max_holding_periods=None, enable_compound=True),
+        dict(stop_loss_pct=0.03, take_profit_pct=None, max_holding_periods=None, enable_compound=True),
+        dict(stop_loss_pct=None, take_profit_pct=0.05, max_holding_periods=None, enable_compound=False),
+        dict(stop_loss_pct=None, take_profit_pct=None, max_holding_periods=5, enable_compound=True),
+        dict(stop_loss_pct=0.02, take_profit_pct=0.04, max_holding_periods=10, enable_compound=False),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = UnifiedBacktestEngine(use_vectorized_engine=False, auto_select_engine=False)
+
+    def _run_both(self, data: pd.DataFrame, **config):
+        args = (data, 'signal', 'close', 100000.0, 1.0, 0.001, 0.001, 5.0,
+                config['stop_loss_pct'], config['take_profit_pct'],
+                config['max_holding_periods'], config['enable_compound'])
+        expected = self.engine._run_iterative_core_backtest(*args)
+        expected_trades = list(self.engine.trades)
+        actual = self.engine._run_core_backtest(*args)
+        actual_trades = list(self.engine.trades)
+        return expected, expected_trades, actual, actual_trades
+
+    def test_parity_across_configs(self):
+        """各种退出规则组合下结果完全一致"""
+        for seed, config in enumerate(self.CONFIGS):
+            with self.subTest(config=config):
+                data = _make_fixture(400, seed)
+                expected, expected_trades, actual, actual_trades = self._run_both(data, **config)
+
+                self.assertGreater(len(expected_trades), 0)
+                self.assertEqual(list(expected.columns), list(actual.columns))
+                pd.testing.assert_frame_equal(expected, actual)
+                self.assertEqual(expected_trades, actual_trades)
+
+    def test_parity_with_nan_signals(self):
+        """信号中存在缺失值时结果一致"""
+        data = _make_fixture(300, 42, nan_signals=True)
+        expected, expected_trades, actual, actual_trades = self._run_both(data, **self.CONFIGS[-1])
+        pd.testing.assert_frame_equal(expected, actual)
+        self.assertEqual(expected_trades, actual_trades)
+
+    def test_single_row_keeps_initial_state(self):
+        """单行数据不交易"""
+        data = _make_fixture(1, 0)
+        result = self.engine._run_core_backtest(
+            data, 'signal', 'close', 100000.0, 1.0, 0.001, 0.001, 5.0, None, None, None, True)
+        self.assertEqual(result['capital'].iloc[0], 100000.0)
+        self.assertEqual(result['position'].iloc[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
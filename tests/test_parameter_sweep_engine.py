@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+向量化参数扫描引擎测试
+
+验证批量 (参数组合 × K线) 计算的得分与逐组合循环的
+ParallelBacktestEngine.optimize_strategy_parameters 一致。
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+try:
+    from backtest.backtest_optimizer import ParallelBacktestEngine
+    from backtest.parameter_sweep_engine import (
+        VectorizedParameterSweepEngine, IndicatorIntermediateCache, ma_cross_signals
+    )
+    ENGINE_AVAILABLE = True
+except ImportError as e:
+    print(f"导入错误: {e}")
+    ENGINE_AVAILABLE = False
+
+
+def _make_prices(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 20.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({'close': close},
+                        index=pd.date_range('2018-01-01', periods=n, freq='D'))
+
+
+def _cross_to_signal(data: pd.DataFrame, fast: pd.Series, slow: pd.Series, warmup: int) -> pd.DataFrame:
+    state = pd.Series(0, index=data.index)
+    state[fast > slow] = 1
+    state[fast < slow] = -1
+    change = state.diff()
+    data = data.copy()
+    data['signal'] = 0
+    data.loc[change == 2, 'signal'] = 1
+    data.loc[change == -2, 'signal'] = -1
+    data.iloc[:warmup, data.columns.get_loc('signal')] = 0
+    return data
+
+
+def ma_cross_strategy(data: pd.DataFrame, short_period: int, long_period: int) -> pd.DataFrame:
+    """逐组合参考实现：均线交叉"""
+    fast = data['close'].rolling(window=short_period).mean()
+    slow = data['close'].rolling(window=long_period).mean()
+    return _cross_to_signal(data, fast, slow, long_period)
+
+
+def bollinger_strategy(data: pd.DataFrame, period: int, std_dev: float) -> pd.DataFrame:
+    """逐组合参考实现：布林带反转"""
+    close = data['close']
+    middle = close.rolling(window=period).mean()
+    std = close.rolling(window=period).std()
+    upper, lower = middle + std * std_dev, middle - std * std_dev
+    buy = (close.shift(1) <= lower.shift(1)) & (close > lower)
+    sell = ~buy & (close.shift(1) >= upper.shift(1)) & (close < upper)
+    data = data.copy()
+    data['signal'] = np.where(buy, 1, np.where(sell, -1, 0))
+    data.iloc[:period, data.columns.get_loc('signal')] = 0
+    return data
+
+
+@unittest.skipUnless(ENGINE_AVAILABLE, "参数扫描引擎不可用")
+class TestVectorizedParameterSweep(unittest.TestCase):
+    """向量化参数扫描一致性测试"""
+
+    def setUp(self):
+        self.data = _make_prices(600, 7)
+        self.loop_engine = ParallelBacktestEngine(max_workers=1)
+        self.sweep_engine = VectorizedParameterSweepEngine(max_workers=1)
+
+    def _assert_same_scores(self, expected, actual):
+        expected_scores = {tuple(sorted(r['params'].items())): r['fold_scores'] for r in expected['all_results']}
+        actual_scores = {tuple(sorted(r['params'].items())): r['fold_scores'] for r in actual['all_results']}
+        self.assertEqual(expected_scores.keys(), actual_scores.keys())
+        for key, scores in expected_scores.items():
+            np.testing.assert_allclose(actual_scores[key], scores, rtol=1e-7, atol=1e-9)
+        self.assertEqual(expected['best_params'], actual['best_params'])
+
+    def test_ma_cross_matches_loop(self):
+        grid = {'short_period': [3, 5, 10], 'long_period': [20, 30]}
+        for metric in ('sharpe_ratio', 'total_return', 'calmar_ratio'):
+            with self.subTest(metric=metric):
+                expected = self.loop_engine.optimize_strategy_parameters(
+                    self.data, ma_cross_strategy, grid, metric, cv_folds=3)
+                actual = self.sweep_engine.optimize(self.data, 'ma_cross', grid, metric, cv_folds=3)
+                self._assert_same_scores(expected, actual)
+
+    def test_bollinger_matches_loop(self):
+        grid = {'period': [10, 20], 'std_dev': [1.0, 1.5, 2.0]}
+        expected = self.loop_engine.optimize_strategy_parameters(
+            self.data, bollinger_strategy, grid, 'total_return', cv_folds=3)
+        actual = self.sweep_engine.optimize(self.data, 'bollinger', grid, 'total_return', cv_folds=3)
+        self._assert_same_scores(expected, actual)
+
+    def test_string_strategy_routes_to_sweep_engine(self):
+        grid = {'period': [6, 14], 'oversold': [25, 30], 'overbought': [70, 75]}
+        result = self.loop_engine.optimize_strategy_parameters(self.data, 'rsi', grid, cv_folds=2)
+        self.assertEqual(len(result['all_results']), 8)
+        self.assertIn('elapsed_seconds', result)
+
+    def test_intermediates_are_shared(self):
+        cache = IndicatorIntermediateCache(self.data['close'].to_numpy())
+        combos = [{'short_period': s, 'long_period': l} for s in (5, 10) for l in (20, 30, 60)]
+        signals = ma_cross_signals(cache, combos)
+        self.assertEqual(signals.shape, (6, len(self.data)))
+        self.assertEqual(cache.misses, 5)
+
+    def test_universe_with_shared_memory_pool(self):
+        data_dict = {f"00000{i}": _make_prices(300 + 50 * i, i) for i in range(3)}
+        grid = {'fast_period': [8, 12], 'slow_period': [26], 'signal_period': [9]}
+        engine = VectorizedParameterSweepEngine(max_workers=2)
+        pooled = engine.optimize_universe(data_dict, 'macd', grid, cv_folds=2)
+        serial = engine.optimize_universe(data_dict, 'macd', grid, cv_folds=2, use_processes=False)
+
+        self.assertEqual(set(pooled['per_symbol']), set(data_dict))
+        for symbol in data_dict:
+            self._assert_same_scores(serial['per_symbol'][symbol], pooled['per_symbol'][symbol])
+        self.assertEqual(pooled['total_combinations'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()